@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from reportlab.pdfbase.ttfonts import TTFError
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .shopping_list import register_fonts
+        try:
+            register_fonts()
+        except TTFError:
+            pass
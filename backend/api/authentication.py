@@ -0,0 +1,83 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_KEY = 'auth_token:{key}'
+
+
+class LocalTokenCache:
+    def __init__(self, size, timeout):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.size = size
+        self.timeout = timeout
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class SharedTokenCache:
+    def __init__(self, alias, timeout):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(TOKEN_KEY.format(key=key))
+
+    def set(self, key, user):
+        self.cache.set(TOKEN_KEY.format(key=key), user, self.timeout)
+
+    def delete_many(self, keys):
+        self.cache.delete_many([TOKEN_KEY.format(key=key) for key in keys])
+
+
+if settings.TOKEN_CACHE_BACKEND == 'local':
+    token_cache = LocalTokenCache(settings.TOKEN_CACHE_SIZE,
+                                  settings.TOKEN_CACHE_TIMEOUT)
+else:
+    token_cache = SharedTokenCache(settings.TOKEN_CACHE_BACKEND,
+                                   settings.TOKEN_CACHE_TIMEOUT)
+
+
+def invalidate_tokens(*keys):
+    token_cache.delete_many(keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, copy.copy(user))
+            return user, token
+        user = copy.copy(user)
+        token = Token(key=key, user=user)
+        token._state.adding = False
+        return user, token
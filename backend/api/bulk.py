@@ -0,0 +1,73 @@
+from django.db import connection, transaction
+from django.db.models import F
+
+from recipes.db import table_name
+from recipes.models import Favorites, Recipe, ShoppingCart, ShoppingListItem
+
+from .recipe_state import invalidate_recipe_state
+from .shopping_list import apply_recipes, bump_cart_version
+
+KINDS = {
+    Favorites: 'favorites',
+    ShoppingCart: 'shopping_cart',
+}
+
+
+def _recipes_changed(model, user_id, recipe_ids, sign):
+    if not recipe_ids:
+        return
+    if model is ShoppingCart:
+        apply_recipes(user_id, recipe_ids, sign=sign)
+        transaction.on_commit(lambda: bump_cart_version(user_id))
+    else:
+        recipes = Recipe.objects.filter(pk__in=recipe_ids)
+        if sign < 0:
+            recipes = recipes.filter(favorites_count__gt=0)
+        recipes.update(favorites_count=F('favorites_count') + sign)
+    transaction.on_commit(
+        lambda: invalidate_recipe_state(user_id, KINDS[model])
+    )
+
+
+@transaction.atomic
+def add_recipes(model, user_id, recipe_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table_name(model)} (user_id, recipe_id) '
+            f'SELECT %s, id FROM {table_name(Recipe)} WHERE id = ANY(%s) '
+            f'ON CONFLICT DO NOTHING RETURNING recipe_id',
+            [user_id, list(recipe_ids)]
+        )
+        added = sorted(recipe_id for recipe_id, in cursor.fetchall())
+    _recipes_changed(model, user_id, added, 1)
+    return added
+
+
+@transaction.atomic
+def remove_recipes(model, user_id, recipe_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table_name(model)} '
+            f'WHERE user_id = %s AND recipe_id = ANY(%s) '
+            f'RETURNING recipe_id',
+            [user_id, list(recipe_ids)]
+        )
+        removed = sorted(recipe_id for recipe_id, in cursor.fetchall())
+    _recipes_changed(model, user_id, removed, -1)
+    return removed
+
+
+@transaction.atomic
+def clear_shopping_cart(user_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table_name(ShoppingCart)} WHERE user_id = %s',
+            [user_id]
+        )
+        deleted = cursor.rowcount
+    ShoppingListItem.objects.filter(user_id=user_id).delete()
+    transaction.on_commit(lambda: bump_cart_version(user_id))
+    transaction.on_commit(
+        lambda: invalidate_recipe_state(user_id, 'shopping_cart')
+    )
+    return deleted
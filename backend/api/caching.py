@@ -0,0 +1,86 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import (http_date, parse_etags,
+                               parse_http_date_safe)
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_routing import read_from_primary
+from .models import ReferenceVersion
+
+VERSION_KEY = 'reference:{model}:version'
+DATA_KEY = 'reference:{model}:{version}:{path}'
+
+
+def invalidate_reference(model):
+    label = model._meta.label_lower
+    ReferenceVersion.objects.update_or_create(
+        label=label,
+        defaults={'version': uuid.uuid4().hex, 'updated_at': timezone.now()}
+    )
+    cache.delete(VERSION_KEY.format(model=label))
+
+
+def get_reference_version(model):
+    label = model._meta.label_lower
+    key = VERSION_KEY.format(model=label)
+    version = cache.get(key)
+    if version is None:
+        with read_from_primary():
+            reference, _ = ReferenceVersion.objects.get_or_create(
+                label=label,
+                defaults={'version': uuid.uuid4().hex,
+                          'updated_at': timezone.now()}
+            )
+        version = (reference.version,
+                   int(reference.updated_at.timestamp()))
+        cache.set(key, version, settings.REFERENCE_VERSION_TIMEOUT)
+    return version
+
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+    )
+    return (if_modified_since is not None and
+            last_modified <= if_modified_since)
+
+
+class ReferenceCacheMixin:
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve,
+                                    request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        model = self.queryset.model
+        version, last_modified = get_reference_version(model)
+        etag = f'"{version}"'
+        if is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = DATA_KEY.format(model=model._meta.label_lower,
+                                  version=version,
+                                  path=request.get_full_path())
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                with read_from_primary():
+                    response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data,
+                          settings.REFERENCE_CACHE_TIMEOUT)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
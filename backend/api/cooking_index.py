@@ -0,0 +1,134 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from recipes.models import Ingredient, NumberOfIngredients
+
+from .caching import get_reference_version
+from .db_routing import read_from_primary
+from .models import RecipeChange
+
+PRUNE_EVERY = 100
+
+
+def record_recipe_change(recipe_id):
+    change = RecipeChange.objects.create(recipe_id=recipe_id)
+    if change.id % PRUNE_EVERY == 0:
+        RecipeChange.objects.filter(created__lt=timezone.now() - timedelta(
+            seconds=settings.RECIPE_CHANGE_RETENTION
+        )).delete()
+
+
+class CookingIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._position = None
+        self._synced = 0.0
+        self._entries = ({}, {})
+
+    def _rebuild(self):
+        position = RecipeChange.objects.aggregate(
+            position=Max('id')
+        )['position'] or 0
+        postings = {}
+        recipes = {}
+        rows = NumberOfIngredients.objects.order_by(
+            'ingredient_id', 'recipe_id'
+        ).values_list('ingredient_id', 'recipe_id')
+        for ingredient_id, recipe_id in rows.iterator():
+            postings.setdefault(ingredient_id, array('q')).append(recipe_id)
+            recipes.setdefault(recipe_id, set()).add(ingredient_id)
+        self._entries = (postings, {
+            recipe_id: tuple(ingredients)
+            for recipe_id, ingredients in recipes.items()
+        })
+        self._position = position
+
+    def _apply_changes(self):
+        changes = dict(RecipeChange.objects.filter(
+            id__gt=self._position
+        ).values_list('recipe_id', 'id'))
+        if not changes:
+            return
+        fresh = {recipe_id: set() for recipe_id in changes}
+        for recipe_id, ingredient_id in NumberOfIngredients.objects.filter(
+            recipe_id__in=list(changes)
+        ).values_list('recipe_id', 'ingredient_id'):
+            fresh[recipe_id].add(ingredient_id)
+        postings, recipes = self._entries
+        postings = dict(postings)
+        recipes = dict(recipes)
+        touched = set()
+        for recipe_id, ingredients in fresh.items():
+            touched.update(recipes.get(recipe_id, ()))
+            touched.update(ingredients)
+            if ingredients:
+                recipes[recipe_id] = tuple(ingredients)
+            else:
+                recipes.pop(recipe_id, None)
+        for ingredient_id in touched:
+            posting = array('q', (
+                recipe_id for recipe_id in postings.get(ingredient_id, ())
+                if recipe_id not in fresh
+            ))
+            posting.extend(
+                recipe_id for recipe_id, ingredients in fresh.items()
+                if ingredient_id in ingredients
+            )
+            if posting:
+                postings[ingredient_id] = posting
+            else:
+                postings.pop(ingredient_id, None)
+        self._entries = (postings, recipes)
+        self._position = max(changes.values())
+
+    def _load(self):
+        now = time.monotonic()
+        if (self._position is not None and
+                now - self._synced < settings.COOKING_INDEX_SYNC_INTERVAL):
+            return self._entries
+        with self._lock, read_from_primary():
+            if now - self._synced >= settings.COOKING_INDEX_SYNC_INTERVAL:
+                version = get_reference_version(Ingredient)
+                if (self._position is None or version != self._version or
+                        now - self._synced >
+                        settings.RECIPE_CHANGE_RETENTION):
+                    self._rebuild()
+                    self._version = version
+                else:
+                    self._apply_changes()
+                self._synced = now
+        return self._entries
+
+    def match(self, ingredient_ids, limit):
+        postings, recipes = self._load()
+        matched = Counter()
+        for ingredient_id in set(ingredient_ids):
+            matched.update(postings.get(ingredient_id, ()))
+        sizes = {recipe_id: len(recipes[recipe_id]) for recipe_id in matched}
+        best = heapq.nsmallest(
+            limit,
+            matched.items(),
+            key=lambda item: (-item[1] / sizes[item[0]],
+                              sizes[item[0]] - item[1],
+                              -item[0])
+        )
+        return [
+            {
+                'id': recipe_id,
+                'coverage': round(count / sizes[recipe_id], 4),
+                'missing': sizes[recipe_id] - count,
+            }
+            for recipe_id, count in best
+        ]
+
+
+cooking_index = CookingIndex()
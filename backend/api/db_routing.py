@@ -0,0 +1,67 @@
+import hashlib
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY_APP_LABELS = {'authtoken', 'sessions'}
+PIN_KEY = 'db_primary_pin:{identity}'
+
+_state = threading.local()
+
+
+def route_reads(alias):
+    _state.replica = alias
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def read_from_primary():
+    replica = getattr(_state, 'replica', None)
+    _state.replica = None
+    try:
+        yield
+    finally:
+        _state.replica = replica
+
+
+def primary_pin_key(request):
+    identity = (request.META.get('HTTP_AUTHORIZATION') or
+                request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    if not identity:
+        return None
+    return PIN_KEY.format(
+        identity=hashlib.sha256(identity.encode()).hexdigest()
+    )
+
+
+def close_unusable_connections():
+    for connection in connections.all():
+        if (connection.connection is not None and
+                not connection.in_atomic_block and
+                not connection.is_usable()):
+            connection.close()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if (replica is None or
+                model._meta.app_label in PRIMARY_APP_LABELS or
+                connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,40 @@
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from recipes.images import VARIANTS
+
+
+class ImageVariantsField(serializers.Field):
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return None
+        return {
+            name: self.file_representation(
+                recipe.image_variants.get(name, recipe.image.name)
+            )
+            for name in VARIANTS
+        }
+
+    def file_representation(self, name):
+        if not api_settings.UPLOAD_FILES_USE_URL:
+            return name
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class UploadOrBase64ImageField(Base64ImageField):
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return serializers.ImageField.to_internal_value(self, data)
+        return super().to_internal_value(data)
@@ -1,14 +1,32 @@
+from django import forms
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework as r_f
 
-from recipes.models import Recipe, Tag
+from recipes.models import Recipe, TagRecipe
+from recipes.search import SEARCH_CONFIG
+
+TAGS_MATCH_CHOICES = (
+    ('any', 'Любой из тэгов'),
+    ('all', 'Все тэги'),
+)
+
+
+class SlugListField(forms.Field):
+    widget = forms.SelectMultiple
+
+    def to_python(self, value):
+        return [slug for slug in value or () if slug]
+
+
+class SlugListFilter(r_f.Filter):
+    field_class = SlugListField
 
 
 class RecipeFilter(r_f.FilterSet):
-    tags = r_f.filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug',
-    )
+    tags = SlugListFilter(method='filter_tags')
+    tags_match = r_f.ChoiceFilter(choices=TAGS_MATCH_CHOICES,
+                                  method='filter_tags_match')
     author = r_f.CharFilter(lookup_expr='exact')
     is_in_shopping_cart = r_f.BooleanFilter(
         field_name='is_in_shopping_cart',
@@ -18,6 +36,7 @@ class RecipeFilter(r_f.FilterSet):
         field_name='is_favorited',
         method='filter'
     )
+    search = r_f.CharFilter(method='filter_search')
 
     def filter(self, queryset, name, value):
         if name == 'is_in_shopping_cart' and value:
@@ -26,6 +45,28 @@ class RecipeFilter(r_f.FilterSet):
             )
         return queryset
 
+    def filter_tags(self, queryset, name, value):
+        tagged = TagRecipe.objects.filter(recipe=OuterRef('pk'))
+        if self.form.cleaned_data.get('tags_match') != 'all':
+            return queryset.annotate(
+                has_tags=Exists(tagged.filter(tag__slug__in=value))
+            ).filter(has_tags=True)
+        for position, slug in enumerate(set(value)):
+            queryset = queryset.annotate(**{
+                f'has_tag_{position}': Exists(tagged.filter(tag__slug=slug))
+            }).filter(**{f'has_tag_{position}': True})
+        return queryset
+
+    def filter_tags_match(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        query = SearchQuery(value, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-pub_date', '-id')
+
     class Meta:
         model = Recipe
-        fields = ['author', 'tags', 'is_in_shopping_cart', 'is_favorited']
+        fields = ['author', 'tags', 'tags_match', 'is_in_shopping_cart',
+                  'is_favorited', 'search']
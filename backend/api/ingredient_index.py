@@ -0,0 +1,52 @@
+import threading
+from bisect import bisect_left
+
+from recipes.models import Ingredient
+
+from .caching import get_reference_version
+from .db_routing import read_from_primary
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = ([], [])
+
+    def _load(self):
+        version = get_reference_version(Ingredient)
+        if version == self._version:
+            return self._entries
+        with self._lock, read_from_primary():
+            if version != self._version:
+                rows = Ingredient.objects.values(
+                    'id', 'name', 'measurement_unit'
+                ).order_by()
+                entries = sorted(
+                    ((row['name'].lower(), row) for row in rows.iterator()),
+                    key=lambda entry: entry[0]
+                )
+                self._entries = ([key for key, row in entries],
+                                 [row for key, row in entries])
+                self._version = version
+        return self._entries
+
+    def search(self, query, limit):
+        keys, rows = self._load()
+        query = query.lower()
+        result = []
+        position = bisect_left(keys, query)
+        while (position < len(keys) and len(result) < limit and
+               keys[position].startswith(query)):
+            result.append(rows[position])
+            position += 1
+        if len(result) < limit:
+            for key, row in zip(keys, rows):
+                if query in key and not key.startswith(query):
+                    result.append(row)
+                    if len(result) == limit:
+                        break
+        return result
+
+
+ingredient_index = IngredientIndex()
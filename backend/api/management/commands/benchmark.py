@@ -0,0 +1,257 @@
+import json
+import math
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from api.caching import invalidate_reference
+from api.shopping_list import rebuild_shopping_list
+from recipes.models import (Favorites, Ingredient, NumberOfIngredients,
+                            Recipe, ShoppingCart, Tag)
+from recipes.search import update_all_search_vectors
+from recipes.timeline import rebuild_timelines
+from users.models import Follow
+
+User = get_user_model()
+
+PREFIX = 'bench_'
+BATCH_SIZE = 1000
+TAGS = ('breakfast', 'lunch', 'dinner', 'dessert', 'snack')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными и замеряет '
+            'производительность основных эндпоинтов API')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Создать синтетические данные')
+        parser.add_argument('--flush', action='store_true',
+                            help='Удалить ранее созданные данные')
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--ingredients-per-recipe', type=int,
+                            default=8)
+        parser.add_argument('--follows', type=int, default=20)
+        parser.add_argument('--favorites', type=int, default=30)
+        parser.add_argument('--cart', type=int, default=5)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--random-seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для JSON-результатов')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['random_seed'])
+        if options['flush']:
+            User.objects.filter(username__startswith=PREFIX).delete()
+        if options['seed']:
+            started = time.monotonic()
+            self.seed(options)
+            self.stderr.write(
+                f'Данные созданы за {time.monotonic() - started:.1f} с'
+            )
+        user = User.objects.filter(
+            username__startswith=PREFIX
+        ).order_by('id').first()
+        if user is None:
+            self.stderr.write('Нет данных для замеров, запустите с --seed')
+            return
+        results = {
+            'database': connection.vendor,
+            'scale': {
+                'users': User.objects.count(),
+                'recipes': Recipe.objects.count(),
+                'ingredients': Ingredient.objects.count(),
+                'favorites': Favorites.objects.count(),
+                'shopping_cart': ShoppingCart.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+            'endpoints': self.measure(user, options['iterations']),
+        }
+        output = json.dumps(results, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def bulk_create(self, model, objects, **kwargs):
+        return model.objects.bulk_create(objects, batch_size=BATCH_SIZE,
+                                         **kwargs)
+
+    @transaction.atomic
+    def seed(self, options):
+        rnd = self.random
+        start = User.objects.filter(username__startswith=PREFIX).count()
+        password = make_password('benchmark')
+        users = self.bulk_create(User, [
+            User(username=f'{PREFIX}{number}',
+                 email=f'{PREFIX}{number}@example.com',
+                 first_name='Bench', last_name=str(number),
+                 password=password)
+            for number in range(start, start + options['users'])
+        ])
+        user_ids = list(User.objects.filter(
+            username__startswith=PREFIX
+        ).values_list('id', flat=True))
+        for slug in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug,
+                defaults={'name': f'{PREFIX}{slug}', 'color': '#49B64E'}
+            )
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        if not Ingredient.objects.exists():
+            self.bulk_create(Ingredient, [
+                Ingredient(name=f'{PREFIX}ingredient {number}',
+                           measurement_unit='г')
+                for number in range(500)
+            ])
+        ingredient_ids = list(Ingredient.objects.values_list('id',
+                                                             flat=True))
+        first_recipe = (Recipe.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0) + 1
+        words = ('суп', 'салат', 'пирог', 'рагу', 'каша', 'омлет',
+                 'запеканка', 'паста', 'блины', 'котлеты')
+        self.bulk_create(Recipe, [
+            Recipe(author_id=rnd.choice(user_ids),
+                   name=f'{rnd.choice(words)} {number}',
+                   text=' '.join(rnd.choices(words, k=30)),
+                   cooking_time=rnd.randint(5, 180))
+            for number in range(options['recipes'])
+        ])
+        recipe_ids = list(Recipe.objects.filter(
+            id__gte=first_recipe
+        ).values_list('id', flat=True))
+        per_recipe = min(options['ingredients_per_recipe'],
+                         len(ingredient_ids))
+        self.bulk_create(NumberOfIngredients, [
+            NumberOfIngredients(recipe_id=recipe_id,
+                                ingredient_id=ingredient_id,
+                                amount=rnd.randint(1, 500))
+            for recipe_id in recipe_ids
+            for ingredient_id in rnd.sample(ingredient_ids, per_recipe)
+        ])
+        self.bulk_create(Recipe.tags.through, [
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rnd.sample(tag_ids, rnd.randint(1, 2))
+        ])
+        all_recipes = list(Recipe.objects.filter(
+            author__username__startswith=PREFIX
+        ).values_list('id', flat=True))
+        for model, count in ((Favorites, options['favorites']),
+                             (ShoppingCart, options['cart'])):
+            self.bulk_create(model, [
+                model(user_id=user.id, recipe_id=recipe_id)
+                for user in users
+                for recipe_id in rnd.sample(all_recipes,
+                                            min(count, len(all_recipes)))
+            ], ignore_conflicts=True)
+        self.bulk_create(Follow, [
+            Follow(user_id=user.id, author_id=author_id)
+            for user in users
+            for author_id in rnd.sample(user_ids,
+                                        min(options['follows'],
+                                            len(user_ids)))
+            if author_id != user.id
+        ], ignore_conflicts=True)
+        self.refresh_denormalized(first_recipe, users)
+
+    def refresh_denormalized(self, first_recipe, users):
+        bench_users = User.objects.filter(username__startswith=PREFIX)
+        Recipe.objects.filter(author__in=bench_users).update(
+            favorites_count=Coalesce(Subquery(
+                Favorites.objects.filter(recipe=OuterRef('pk')).order_by(
+                ).values('recipe').annotate(total=Count('pk')).values('total')
+            ), 0)
+        )
+        bench_users.update(recipes_count=Coalesce(Subquery(
+            Recipe.objects.filter(author=OuterRef('pk')).order_by(
+            ).values('author').annotate(total=Count('pk')).values('total')
+        ), 0))
+        bench_users.update(followers_count=Coalesce(Subquery(
+            Follow.objects.filter(author=OuterRef('pk')).order_by(
+            ).values('author').annotate(total=Count('pk')).values('total')
+        ), 0))
+        rebuild_timelines(bench_users.values_list('id', flat=True))
+        update_all_search_vectors(first_recipe)
+        for user in users:
+            rebuild_shopping_list(user.id)
+        invalidate_reference(Ingredient)
+
+    def endpoints(self):
+        recipe = Recipe.objects.order_by('?').first()
+        tag = Tag.objects.order_by('id').first()
+        ingredient = Ingredient.objects.order_by('?').first()
+        endpoints = {
+            'recipes_list': '/api/recipes/?limit=6',
+            'recipes_list_cursor': '/api/recipes/?limit=6&pagination=cursor',
+            'recipes_favorited': '/api/recipes/?is_favorited=1&limit=6',
+            'subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+            'timeline': '/api/recipes/timeline/?limit=6',
+            'download_shopping_cart_txt':
+                '/api/recipes/download_shopping_cart/?format=txt',
+            'download_shopping_cart_pdf':
+                '/api/recipes/download_shopping_cart/?format=pdf',
+        }
+        if recipe is not None:
+            endpoints['recipe_detail'] = f'/api/recipes/{recipe.id}/'
+            endpoints['recipes_search'] = (
+                f'/api/recipes/?search={recipe.name.split()[0]}'
+            )
+        if tag is not None:
+            endpoints['recipes_by_tag'] = (
+                f'/api/recipes/?tags={tag.slug}&limit=6'
+            )
+            endpoints['recipes_by_all_tags'] = (
+                f'/api/recipes/?tags={tag.slug}&tags=dinner'
+                f'&tags_match=all&limit=6'
+            )
+        if ingredient is not None:
+            endpoints['ingredients_search'] = (
+                f'/api/ingredients/?name={ingredient.name[:2]}'
+            )
+        return endpoints
+
+    def measure(self, user, iterations):
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        results = {}
+        for name, url in sorted(self.endpoints().items()):
+            timings = []
+            queries = []
+            status_code = None
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    timings.append(time.perf_counter() - started)
+                queries.append(len(context.captured_queries))
+                status_code = response.status_code
+            total = sum(timings)
+            results[name] = {
+                'url': url,
+                'status': status_code,
+                'iterations': iterations,
+                'throughput_rps': round(iterations / total, 2),
+                'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+                'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+                'queries_max': max(queries),
+                'queries_min': min(queries),
+            }
+        return results
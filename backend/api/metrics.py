@@ -0,0 +1,129 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.render_seconds = 0.0
+        self.latency_seconds = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, queries, db_seconds, serializer_seconds,
+               render_seconds, latency_seconds):
+        with self._lock:
+            stats = self._views.setdefault(view, ViewStats())
+            stats.requests += 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.serializer_seconds += serializer_seconds
+            stats.render_seconds += render_seconds
+            stats.latency_seconds += latency_seconds
+            position = bisect_left(LATENCY_BUCKETS, latency_seconds)
+            if position < len(LATENCY_BUCKETS):
+                stats.latency_buckets[position] += 1
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                '# HELP foodgram_requests_total Processed requests',
+                '# TYPE foodgram_requests_total counter',
+            ]
+            lines += [f'foodgram_requests_total{{view="{view}"}} '
+                      f'{stats.requests}' for view, stats in views]
+            lines += [
+                '# HELP foodgram_db_queries_total Executed SQL queries',
+                '# TYPE foodgram_db_queries_total counter',
+            ]
+            lines += [f'foodgram_db_queries_total{{view="{view}"}} '
+                      f'{stats.queries}' for view, stats in views]
+            lines += [
+                '# HELP foodgram_db_seconds_total Time spent in the database',
+                '# TYPE foodgram_db_seconds_total counter',
+            ]
+            lines += [f'foodgram_db_seconds_total{{view="{view}"}} '
+                      f'{stats.db_seconds:.6f}' for view, stats in views]
+            lines += [
+                '# HELP foodgram_serializer_seconds_total '
+                'Time spent serializing response data',
+                '# TYPE foodgram_serializer_seconds_total counter',
+            ]
+            lines += [f'foodgram_serializer_seconds_total'
+                      f'{{view="{view}"}} '
+                      f'{stats.serializer_seconds:.6f}'
+                      for view, stats in views]
+            lines += [
+                '# HELP foodgram_render_seconds_total '
+                'Time spent rendering response bodies',
+                '# TYPE foodgram_render_seconds_total counter',
+            ]
+            lines += [f'foodgram_render_seconds_total'
+                      f'{{view="{view}"}} '
+                      f'{stats.render_seconds:.6f}'
+                      for view, stats in views]
+            lines += [
+                '# HELP foodgram_request_seconds Request latency',
+                '# TYPE foodgram_request_seconds histogram',
+            ]
+            for view, stats in views:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS,
+                                        stats.latency_buckets):
+                    cumulative += count
+                    lines.append(f'foodgram_request_seconds_bucket'
+                                 f'{{view="{view}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'foodgram_request_seconds_bucket'
+                             f'{{view="{view}",le="+Inf"}} {stats.requests}')
+                lines.append(f'foodgram_request_seconds_sum{{view="{view}"}} '
+                             f'{stats.latency_seconds:.6f}')
+                lines.append(f'foodgram_request_seconds_count'
+                             f'{{view="{view}"}} {stats.requests}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def time_serializer(request, serializer):
+    request = getattr(request, '_request', request)
+    to_representation = serializer.to_representation
+
+    def timed_representation(instance):
+        started = time.monotonic()
+        try:
+            return to_representation(instance)
+        finally:
+            request.serializer_seconds = (
+                getattr(request, 'serializer_seconds', 0.0) +
+                time.monotonic() - started
+            )
+
+    serializer.to_representation = timed_representation
+    return serializer
+
+
+class SerializerTimingMixin:
+    def get_serializer(self, *args, **kwargs):
+        return time_serializer(self.request,
+                               super().get_serializer(*args, **kwargs))
+
+
+def metrics_view(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
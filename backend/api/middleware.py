@@ -0,0 +1,97 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_routing import choose_replica, primary_pin_key, route_reads
+from .metrics import registry
+
+logger = logging.getLogger('foodgram.performance')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.monotonic() - started
+            self.queries += 1
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.metrics_view = None
+        request.serializer_seconds = 0.0
+        request.render_seconds = 0.0
+        counter = QueryCounter()
+        started = time.monotonic()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        latency = time.monotonic() - started
+        view = request.metrics_view
+        if view is None:
+            return response
+        registry.record(view, counter.queries, counter.seconds,
+                        request.serializer_seconds, request.render_seconds,
+                        latency)
+        if (counter.queries > settings.SLOW_REQUEST_QUERIES or
+                latency > settings.SLOW_REQUEST_SECONDS):
+            logger.warning(
+                '%s %s (%s): %d queries, db %.3f s, total %.3f s',
+                request.method, request.path, view, counter.queries,
+                counter.seconds, latency
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            request.metrics_view = (f'{view_func.__module__}.'
+                                    f'{view_func.__name__}')
+        else:
+            actions = getattr(view_func, 'actions', None) or {}
+            action = actions.get(request.method.lower(),
+                                 request.method.lower())
+            request.metrics_view = f'{view_class.__name__}.{action}'
+
+    def process_template_response(self, request, response):
+        started = time.monotonic()
+        response.render()
+        request.render_seconds += time.monotonic() - started
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        pin_key = primary_pin_key(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if pin_key is not None and response.status_code < 400:
+                cache.set(pin_key, True,
+                          settings.DATABASE_REPLICA_PIN_SECONDS)
+            return response
+        if pin_key is None or cache.get(pin_key) is None:
+            route_reads(choose_replica())
+        try:
+            return self.get_response(request)
+        finally:
+            route_reads(None)
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.19 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True,
+                                        primary_key=True,
+                                        serialize=False,
+                                        verbose_name='ID')),
+                ('label', models.CharField(max_length=100,
+                                           unique=True,
+                                           verbose_name='Модель')),
+                ('version', models.CharField(max_length=32,
+                                             verbose_name='Версия')),
+                ('updated_at', models.DateTimeField(
+                    verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия справочника',
+                'verbose_name_plural': 'Версии справочников',
+            },
+        ),
+    ]
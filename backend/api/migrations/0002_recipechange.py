@@ -0,0 +1,31 @@
+# Generated by Django 2.2.19 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True,
+                                        primary_key=True,
+                                        serialize=False,
+                                        verbose_name='ID')),
+                ('recipe_id', models.IntegerField(verbose_name='Рецепт')),
+                ('created', models.DateTimeField(
+                    auto_now_add=True,
+                    db_index=True,
+                    verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение рецепта',
+                'verbose_name_plural': 'Изменения рецептов',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class ReferenceVersion(models.Model):
+    label = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Модель'
+    )
+    version = models.CharField(
+        max_length=32,
+        verbose_name='Версия'
+    )
+    updated_at = models.DateTimeField(verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Версия справочника'
+        verbose_name_plural = 'Версии справочников'
+
+    def __str__(self):
+        return f'{self.label}: {self.version}'
+
+
+class RecipeChange(models.Model):
+    recipe_id = models.IntegerField(verbose_name='Рецепт')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Изменение рецепта'
+        verbose_name_plural = 'Изменения рецептов'
@@ -1,6 +1,75 @@
-from rest_framework.pagination import PageNumberPagination
+from datetime import datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
 
 
 class CustomPageNumberPaginator(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 6
+
+
+class CustomCursorPaginator(CursorPagination):
+    page_size_query_param = 'limit'
+    page_size = 6
+    ordering = ('-pub_date', '-id')
+
+
+class SubscriptionsCursorPaginator(CustomCursorPaginator):
+    ordering = ('-id', )
+
+
+class TimelineCursorPaginator(CustomCursorPaginator):
+    def paginate_entries(self, request, fetch):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        position = None
+        if cursor is not None and cursor.position:
+            pub_date, _, recipe_id = cursor.position.rpartition('|')
+            try:
+                position = (datetime.fromisoformat(pub_date), int(recipe_id))
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+        entries = fetch(position, self.page_size + 1)
+        self.has_next = len(entries) > self.page_size
+        entries = entries[:self.page_size]
+        if entries:
+            pub_date, recipe_id = entries[-1]
+            self.next_position = f'{pub_date.isoformat()}|{recipe_id}'
+        return [recipe_id for _, recipe_id in entries]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        return None
+
+
+class CursorPaginationMixin:
+    cursor_pagination_class = CustomCursorPaginator
+    ranked_query_params = ('search', )
+
+    def use_cursor_pagination(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        params = request.query_params
+        if any(params.get(param) for param in self.ranked_query_params):
+            return False
+        return (CustomCursorPaginator.cursor_query_param in params or
+                params.get('pagination') == 'cursor')
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if (self.pagination_class is not None and
+                    self.use_cursor_pagination()):
+                self._paginator = self.cursor_pagination_class()
+                return self._paginator
+        return super().paginator
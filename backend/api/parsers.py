@@ -0,0 +1,20 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+
+class MultiPartJSONParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        result = super().parse(stream, media_type, parser_context)
+        payload = result.data.get('data')
+        if payload is None:
+            return result
+        try:
+            data = json.loads(payload)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+        if not isinstance(data, dict):
+            raise ParseError('Поле data должно содержать JSON-объект')
+        data.update(result.files.dict())
+        return DataAndFiles(data, {})
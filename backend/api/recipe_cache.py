@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import Ingredient, Tag
+from .caching import get_reference_version
+
+DETAIL_KEY = 'recipe_detail:{recipe_id}:{tags}:{ingredients}'
+USER_FIELDS = ('is_favorited', 'is_in_shopping_cart')
+
+
+def detail_key(recipe_id):
+    return DETAIL_KEY.format(
+        recipe_id=recipe_id,
+        tags=get_reference_version(Tag)[0],
+        ingredients=get_reference_version(Ingredient)[0]
+    )
+
+
+def get_recipe_detail(recipe_id):
+    return cache.get(detail_key(recipe_id))
+
+
+def set_recipe_detail(recipe_id, data):
+    data = dict(data)
+    data.update({field: False for field in USER_FIELDS})
+    data['author'] = dict(data['author'], is_subscribed=False)
+    cache.set(detail_key(recipe_id), data, settings.RECIPE_CACHE_TIMEOUT)
+
+
+def invalidate_recipe_detail(*recipe_ids):
+    cache.delete_many([detail_key(recipe_id) for recipe_id in recipe_ids])
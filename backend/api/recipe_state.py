@@ -0,0 +1,53 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import Favorites, ShoppingCart
+from .db_routing import read_from_primary
+
+STATE_KEY = 'recipe_state:{user_id}:{kind}'
+MODELS = {
+    'favorites': Favorites,
+    'shopping_cart': ShoppingCart,
+}
+
+
+def invalidate_recipe_state(user_id, kind):
+    cache.delete(STATE_KEY.format(user_id=user_id, kind=kind))
+
+
+def load_recipe_ids(user_id, kind):
+    key = STATE_KEY.format(user_id=user_id, kind=kind)
+    recipe_ids = cache.get(key)
+    if recipe_ids is None:
+        with read_from_primary():
+            recipe_ids = array('q', MODELS[kind].objects.filter(
+                user_id=user_id
+            ).order_by('recipe_id').values_list('recipe_id', flat=True))
+        cache.set(key, recipe_ids, settings.RECIPE_STATE_CACHE_TIMEOUT)
+    return recipe_ids
+
+
+class RecipeState:
+    def __init__(self, user):
+        self.user_id = user.id
+        self._recipe_ids = {}
+
+    def recipe_ids(self, kind):
+        if kind not in self._recipe_ids:
+            self._recipe_ids[kind] = load_recipe_ids(self.user_id, kind)
+        return self._recipe_ids[kind]
+
+    def contains(self, kind, recipe_id):
+        recipe_ids = self.recipe_ids(kind)
+        position = bisect_left(recipe_ids, recipe_id)
+        return (position < len(recipe_ids) and
+                recipe_ids[position] == recipe_id)
+
+    def is_favorited(self, recipe_id):
+        return self.contains('favorites', recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id):
+        return self.contains('shopping_cart', recipe_id)
@@ -0,0 +1,40 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+ERROR_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+class ShoppingListRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    @property
+    def content_type(self):
+        if self.charset is None:
+            return self.media_type
+        return f'{self.media_type}; charset={self.charset}'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = ERROR_CONTENT_TYPE
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+
+class PlainTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import MethodNotAllowed
 
 from recipes.models import (Favorites, Ingredient, NumberOfIngredients,
                             Recipe, ShoppingCart, Tag)
+from recipes.search import update_search_vector
 from users.serializers import UserSerializer
 
+from .fields import ImageVariantsField, UploadOrBase64ImageField
+from .shopping_list import apply_ingredient_delta, bump_recipe_carts
+
 User = get_user_model()
 
 
@@ -30,6 +35,7 @@ class GetRecipeSerializer(serializers.ModelSerializer):
     ingredients = serializers.SerializerMethodField(read_only=True)
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    images = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -42,11 +48,19 @@ class GetRecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'images',
             'cooking_time',
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'is_subscribed'):
+            instance.author.is_subscribed = instance.is_subscribed
+        return super().to_representation(instance)
+
     def get_ingredients(self, obj):
-        ingredients = NumberOfIngredients.objects.filter(recipe=obj)
+        ingredients = obj.amount.all()
+        if 'amount' not in getattr(obj, '_prefetched_objects_cache', {}):
+            ingredients = ingredients.select_related('ingredient')
         return NumberOfIngredientSerializer(ingredients,
                                             many=True).data
 
@@ -54,6 +68,9 @@ class GetRecipeSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        recipe_state = self.context.get('recipe_state')
+        if recipe_state is not None:
+            return recipe_state.is_favorited(obj.id)
         return Favorites.objects.filter(user=request.user,
                                         recipe=obj).exists()
 
@@ -61,6 +78,9 @@ class GetRecipeSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        recipe_state = self.context.get('recipe_state')
+        if recipe_state is not None:
+            return recipe_state.is_in_shopping_cart(obj.id)
         return ShoppingCart.objects.filter(user=request.user,
                                            recipe=obj).exists()
 
@@ -78,9 +98,7 @@ class NumberOfIngredientSerializer(serializers.ModelSerializer):
 
 
 class CreateIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-            queryset=Ingredient.objects.all()
-    )
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -93,7 +111,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
                                               many=True)
     ingredients = CreateIngredientSerializer(many=True)
     author = UserSerializer(read_only=True)
-    image = Base64ImageField()
+    image = UploadOrBase64ImageField()
 
     class Meta:
         model = Recipe
@@ -104,29 +122,31 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         image = data.get('image')
-        MAX_IMAGE_SIZE = 12000000
-        if image is not None and image.size > MAX_IMAGE_SIZE:
+        if image is not None and image.size > settings.RECIPE_IMAGE_MAX_SIZE:
             raise serializers.ValidationError({
                 'image': 'Слишком большой размер файла!',
             })
-        ingredients = self.initial_data.get('ingredients')
+        ingredients = data.get('ingredients')
         if not ingredients:
             raise serializers.ValidationError(
                 'Выберите как минимум один ингредиент!',
             )
-        ingredient_list = []
+        ingredient_ids = set()
         for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredient_list:
+            if ingredient['id'] in ingredient_ids:
                 raise serializers.ValidationError(
                     'Ингредиент уже был добавлен!',
                 )
-            ingredient_list.append(ingredient_id)
-            amount = ingredient['amount']
-            if int(amount) <= 0:
+            ingredient_ids.add(ingredient['id'])
+            if ingredient['amount'] <= 0:
                 raise serializers.ValidationError({
                     'amount': 'Введите необходимое кол-во ингредиента!',
                 })
+        if Ingredient.objects.filter(
+                id__in=ingredient_ids).count() != len(ingredient_ids):
+            raise serializers.ValidationError({
+                'ingredients': 'Ингредиент не найден!',
+            })
         tags = self.initial_data.get('tags')
         if not tags:
             raise serializers.ValidationError({
@@ -147,29 +167,58 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         return data
 
     def create_ingredients(self, ingredients, recipe):
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            amount = ingredient['amount']
-            ingredient = Ingredient.objects.get(name=ingredient_id)
-            NumberOfIngredients.objects.create(
+        NumberOfIngredients.objects.bulk_create(
+            NumberOfIngredients(
                 recipe=recipe,
-                ingredient=ingredient,
-                amount=amount
-            )
+                ingredient_id=ingredient['id'],
+                amount=ingredient['amount']
+            ) for ingredient in ingredients
+        )
 
-    def create_tags(self, tags_id, recipe):
-        for tag_id in tags_id:
-            recipe.tags.add(tag_id)
+    def update_ingredients(self, ingredients, recipe):
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        existing = {row.ingredient_id: row for row in recipe.amount.all()}
+        delta = {
+            ingredient_id: amounts.get(ingredient_id, 0) - row.amount
+            for ingredient_id, row in existing.items()
+        }
+        for ingredient_id, amount in amounts.items():
+            if ingredient_id not in existing:
+                delta[ingredient_id] = amount
+        delta = {key: value for key, value in delta.items() if value}
+        NumberOfIngredients.objects.filter(
+            id__in=[row.id for ingredient_id, row in existing.items()
+                    if ingredient_id not in amounts]
+        ).delete()
+        changed = []
+        for ingredient_id, row in existing.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and row.amount != amount:
+                row.amount = amount
+                changed.append(row)
+        NumberOfIngredients.objects.bulk_update(changed, ['amount'])
+        self.create_ingredients(
+            [ingredient for ingredient in ingredients
+             if ingredient['id'] not in existing],
+            recipe
+        )
+        if delta:
+            apply_ingredient_delta(recipe.id, delta)
+            transaction.on_commit(lambda: bump_recipe_carts(recipe.id))
 
+    @transaction.atomic
     def create(self, validated_data):
         author = self.context.get('request').user
-        tags_id = validated_data.pop('tags')
+        tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(author=author,
                                        **validated_data)
-        self.create_tags(tags_id, recipe)
+        recipe.tags.set(tags)
         self.create_ingredients(ingredients, recipe)
-        print(recipe)
+        update_search_vector(recipe.id)
         return recipe
 
     def to_representation(self, instance):
@@ -177,78 +226,42 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         context = {'request': request, }
         return GetRecipeSerializer(instance, context=context).data
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if self.context['request'].method == 'PUT':
             raise MethodNotAllowed('PUT')
-        instance.image = validated_data.get('image')
-        instance.name = validated_data.get('name')
-        instance.text = validated_data.get('text')
+        instance.image = validated_data.get('image', instance.image)
+        instance.name = validated_data.get('name', instance.name)
+        instance.text = validated_data.get('text', instance.text)
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time
         )
-        instance.tags.clear()
-        tags = validated_data.get('tags')
-        self.create_tags(tags, instance)
-        NumberOfIngredients.objects.filter(recipe=instance).all().delete()
-        ingredients = validated_data.get('ingredients')
-        self.create_ingredients(ingredients, instance)
+        instance.tags.set(validated_data.get('tags'))
+        self.update_ingredients(validated_data.get('ingredients'), instance)
         instance.save()
         return instance
 
 
-class FavoritesSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Favorites
-        fields = ('user', 'recipe')
+class RecipeMatchSerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.RECIPE_MATCH_INGREDIENTS_LIMIT
+    )
+    limit = serializers.IntegerField(min_value=1, required=False)
 
-    def validate(self, data):
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        recipe = data['recipe']
-        if Favorites.objects.filter(user=request.user,
-                                    recipe=recipe.id).exists():
-            raise serializers.ValidationError({
-                    'recipe': 'Рецепт уже был добавлен в избранное!'
-            })
-        return data
 
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
-        return RecipeShoppingCartSerializer(instance.recipe,
-                                            context=context).data
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_RECIPES_LIMIT
+    )
 
 
 class RecipeShoppingCartSerializer(serializers.ModelSerializer):
+    images = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
-
-
-class ShoppingCartSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = ShoppingCart
-        fields = ('user', 'recipe')
-
-    def validate(self, data):
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        recipe = data['recipe']
-        if ShoppingCart.objects.filter(user=request.user,
-                                       recipe__id=recipe.id).exists():
-            raise serializers.ValidationError({
-                'status': 'Рецепт уже добавлен!'
-            })
-        return data
-
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
-        return RecipeShoppingCartSerializer(
-            instance.recipe,
-            context=context).data
+        fields = ('id', 'name', 'image', 'images', 'cooking_time')
@@ -0,0 +1,212 @@
+import codecs
+import csv
+import io
+import uuid
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from recipes.db import table_name
+from recipes.models import (Ingredient, NumberOfIngredients, ShoppingCart,
+                            ShoppingListItem)
+
+from .caching import get_reference_version
+
+FONT_NAME = 'DejaVuSans'
+FONT_FILE = 'DejaVuSans.ttf'
+CACHE_TIMEOUT = 60 * 60 * 24
+VERSION_KEY = 'shopping_cart_version:{user_id}'
+DOCUMENT_KEY = ('shopping_cart:{user_id}:{version}:{ingredients}:'
+                '{export_format}')
+AMOUNTS_SQL = (
+    'SELECT ingredient_id, SUM(amount) AS total '
+    'FROM {amounts} WHERE recipe_id = ANY(%s) GROUP BY ingredient_id'
+)
+
+
+def register_fonts():
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_FILE, 'utf-8'))
+
+
+def get_cart_version(user_id):
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(key, version, CACHE_TIMEOUT)
+    return version
+
+
+def bump_cart_version(*user_ids):
+    cache.delete_many(
+        [VERSION_KEY.format(user_id=user_id) for user_id in user_ids]
+    )
+
+
+def bump_recipe_carts(recipe_id):
+    users = list(ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+    bump_cart_version(*users)
+    return users
+
+
+@transaction.atomic
+def apply_recipes(user_id, recipe_ids, sign=1):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    items = table_name(ShoppingListItem)
+    amounts = AMOUNTS_SQL.format(amounts=table_name(NumberOfIngredients))
+    with connection.cursor() as cursor:
+        if sign > 0:
+            cursor.execute(
+                f'INSERT INTO {items} (user_id, ingredient_id, amount) '
+                f'SELECT %s, ingredient_id, total FROM ({amounts}) AS delta '
+                f'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+                f'SET amount = {items}.amount + EXCLUDED.amount',
+                [user_id, recipe_ids]
+            )
+            return
+        cursor.execute(
+            f'UPDATE {items} SET amount = GREATEST(amount - delta.total, 0) '
+            f'FROM ({amounts}) AS delta WHERE user_id = %s '
+            f'AND {items}.ingredient_id = delta.ingredient_id',
+            [recipe_ids, user_id]
+        )
+        cursor.execute(
+            f'DELETE FROM {items} WHERE user_id = %s AND amount = 0',
+            [user_id]
+        )
+
+
+@transaction.atomic
+def apply_ingredient_delta(recipe_id, delta):
+    increments = {key: value for key, value in delta.items() if value > 0}
+    decrements = {key: -value for key, value in delta.items() if value < 0}
+    items = table_name(ShoppingListItem)
+    carts = table_name(ShoppingCart)
+    with connection.cursor() as cursor:
+        if increments:
+            cursor.execute(
+                f'INSERT INTO {items} (user_id, ingredient_id, amount) '
+                f'SELECT cart.user_id, delta.ingredient_id, delta.amount '
+                f'FROM {carts} AS cart, '
+                f'unnest(%s::integer[], %s::integer[]) '
+                f'AS delta(ingredient_id, amount) WHERE cart.recipe_id = %s '
+                f'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+                f'SET amount = {items}.amount + EXCLUDED.amount',
+                [list(increments), list(increments.values()), recipe_id]
+            )
+        if not decrements:
+            return
+        cursor.execute(
+            f'UPDATE {items} '
+            f'SET amount = GREATEST({items}.amount - delta.amount, 0) '
+            f'FROM {carts} AS cart, unnest(%s::integer[], %s::integer[]) '
+            f'AS delta(ingredient_id, amount) WHERE cart.recipe_id = %s '
+            f'AND {items}.user_id = cart.user_id '
+            f'AND {items}.ingredient_id = delta.ingredient_id',
+            [list(decrements), list(decrements.values()), recipe_id]
+        )
+        cursor.execute(
+            f'DELETE FROM {items} WHERE amount = 0 AND user_id IN '
+            f'(SELECT user_id FROM {carts} WHERE recipe_id = %s)',
+            [recipe_id]
+        )
+
+
+@transaction.atomic
+def rebuild_shopping_list(user_id):
+    ShoppingListItem.objects.filter(user_id=user_id).delete()
+    apply_recipes(user_id, ShoppingCart.objects.filter(
+        user_id=user_id
+    ).values_list('recipe_id', flat=True))
+
+
+def get_shopping_list(user):
+    rows = ShoppingListItem.objects.filter(user=user).values_list(
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'amount'
+    ).order_by('ingredient__name')
+    return [
+        {'name': name, 'measurement_unit': measurement_unit, 'amount': amount}
+        for name, measurement_unit, amount in rows
+    ]
+
+
+def render_pdf(ingredients):
+    register_fonts()
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, bottomup=0)
+    textob = c.beginText()
+    textob.setTextOrigin(inch, inch)
+    textob.setFont(FONT_NAME, 14)
+    for line in ingredients:
+        textob.textLine(line['name'] +
+                        ', ' + line['measurement_unit'] +
+                        ': ' + str(line['amount']))
+    c.drawText(textob)
+    c.showPage()
+    c.save()
+    yield buf.getvalue()
+
+
+def render_txt(ingredients):
+    for line in ingredients:
+        yield (f'{line["name"]}, '
+               f'{line["measurement_unit"]}: '
+               f'{line["amount"]}\n').encode('utf-8')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def render_csv(ingredients):
+    writer = csv.writer(Echo())
+    yield codecs.BOM_UTF8
+    yield writer.writerow(
+        ['name', 'measurement_unit', 'amount']
+    ).encode('utf-8')
+    for line in ingredients:
+        yield writer.writerow([
+            line['name'],
+            line['measurement_unit'],
+            line['amount'],
+        ]).encode('utf-8')
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'txt': render_txt,
+    'csv': render_csv,
+}
+
+
+def _cache_stream(key, chunks):
+    document = []
+    for chunk in chunks:
+        document.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(document), CACHE_TIMEOUT)
+
+
+def export_shopping_list(user, export_format):
+    ingredients, _ = get_reference_version(Ingredient)
+    key = DOCUMENT_KEY.format(user_id=user.id,
+                              version=get_cart_version(user.id),
+                              ingredients=ingredients,
+                              export_format=export_format)
+    document = cache.get(key)
+    if document is not None:
+        return iter([document])
+    chunks = RENDERERS[export_format](get_shopping_list(user))
+    return _cache_stream(key, chunks)
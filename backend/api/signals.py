@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.models import User
+from recipes.models import (Favorites, Ingredient, Recipe, ShoppingCart,
+                            Tag)
+from .authentication import invalidate_tokens
+from .caching import invalidate_reference
+from .cooking_index import record_recipe_change
+from .db_routing import close_unusable_connections
+from .recipe_cache import invalidate_recipe_detail
+from .recipe_state import invalidate_recipe_state
+from .shopping_list import (apply_recipes, bump_cart_version,
+                            rebuild_shopping_list)
+
+
+@receiver([post_save, post_delete], sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_cart_version(instance.user_id))
+    transaction.on_commit(
+        lambda: invalidate_recipe_state(instance.user_id, 'shopping_cart')
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_created(sender, instance, created, **kwargs):
+    if created:
+        apply_recipes(instance.user_id, [instance.recipe_id])
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    apply_recipes(instance.user_id, [instance.recipe_id], sign=-1)
+
+
+@receiver([post_save, post_delete], sender=Favorites)
+def favorites_changed(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: invalidate_recipe_state(instance.user_id, 'favorites')
+    )
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    instance.cart_user_ids = list(ShoppingCart.objects.filter(
+        recipe_id=instance.id
+    ).values_list('user_id', flat=True))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    for user_id in getattr(instance, 'cart_user_ids', ()):
+        rebuild_shopping_list(user_id)
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: record_recipe_change(instance.id))
+    transaction.on_commit(lambda: invalidate_recipe_detail(instance.id))
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    if not created and update_fields != frozenset(['last_login']):
+        invalidate_recipe_detail(
+            *instance.recipes.values_list('id', flat=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_tokens(*Token.objects.filter(
+        user_id=instance.id
+    ).values_list('key', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Token)
+def token_changed(sender, instance, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=Tag)
+def reference_changed(sender, **kwargs):
+    invalidate_reference(sender)
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    if settings.DB_CONN_HEALTH_CHECKS:
+        close_unusable_connections()
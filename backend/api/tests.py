@@ -0,0 +1,222 @@
+import io
+import json
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import (Favorites, Ingredient, NumberOfIngredients,
+                            Recipe, ShoppingCart, Tag)
+from users.models import User
+
+from .shopping_list import get_shopping_list
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipeListQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='cook@example.com',
+            username='cook',
+            first_name='Повар',
+            last_name='Поваров',
+            password='password'
+        )
+        tags = [
+            Tag.objects.create(name=f'Тэг {number}', color='#FF0000',
+                               slug=f'tag-{number}')
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {number}',
+                                      measurement_unit='г')
+            for number in range(3)
+        ]
+        for number in range(12):
+            recipe = Recipe.objects.create(
+                author=cls.user,
+                name=f'Рецепт {number}',
+                text='Описание',
+                cooking_time=10
+            )
+            recipe.tags.set(tags)
+            NumberOfIngredients.objects.bulk_create(
+                NumberOfIngredients(recipe=recipe, ingredient=ingredient,
+                                    amount=100)
+                for ingredient in ingredients
+            )
+            Favorites.objects.create(user=cls.user, recipe=recipe)
+            ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def count_queries(self, client, limit):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(RECIPES_URL, {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+        return len(context)
+
+    def assert_constant_queries(self, client):
+        expected = self.count_queries(client, 2)
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = client.get(RECIPES_URL, {'limit': 10})
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_anonymous_list_queries_do_not_grow_with_limit(self):
+        self.assert_constant_queries(APIClient())
+
+    def test_authenticated_list_queries_do_not_grow_with_limit(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assert_constant_queries(client)
+
+
+def png_file(name='dish.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+class CreateRecipeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='baker@example.com',
+            username='baker',
+            first_name='Пекарь',
+            last_name='Пекарев',
+            password='password'
+        )
+        cls.tag = Tag.objects.create(name='Завтрак', color='#00FF00',
+                                     slug='breakfast')
+        cls.ingredient = Ingredient.objects.create(name='Мука',
+                                                   measurement_unit='г')
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def payload(self):
+        return json.dumps({
+            'name': 'Блины',
+            'text': 'Смешать и пожарить',
+            'cooking_time': 20,
+            'tags': [self.tag.id],
+            'ingredients': [{'id': self.ingredient.id, 'amount': 300}],
+        })
+
+    def test_multipart_recipe_is_created(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = self.client.post(
+                RECIPES_URL,
+                {'data': self.payload(), 'image': png_file()},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED,
+                         response.data)
+        recipe = Recipe.objects.get(id=response.data['id'])
+        self.assertTrue(recipe.image.name.endswith('.png'))
+        self.assertEqual(
+            list(recipe.amount.values_list('ingredient_id', 'amount')),
+            [(self.ingredient.id, 300)]
+        )
+
+    def test_oversized_upload_is_rejected(self):
+        image = SimpleUploadedFile('dish.png', b'0' * 2048,
+                                   content_type='image/png')
+        with override_settings(MEDIA_ROOT=self.media_root,
+                               RECIPE_IMAGE_MAX_SIZE=1024):
+            response = self.client.post(
+                RECIPES_URL,
+                {'data': self.payload(), 'image': image},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code,
+                         status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_duplicate_ingredient_ids_are_rejected(self):
+        payload = json.loads(self.payload())
+        payload['ingredients'] = [
+            {'id': self.ingredient.id, 'amount': 100},
+            {'id': str(self.ingredient.id), 'amount': 200},
+        ]
+        response = self.client.post(RECIPES_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+
+class ShoppingListTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='buyer@example.com',
+            username='buyer',
+            first_name='Покупатель',
+            last_name='Покупателев',
+            password='password'
+        )
+        cls.flour = Ingredient.objects.create(name='Мука',
+                                              measurement_unit='г')
+        cls.milk = Ingredient.objects.create(name='Молоко',
+                                             measurement_unit='мл')
+        cls.tag = Tag.objects.create(name='Ужин', color='#0000FF',
+                                     slug='dinner')
+        cls.recipes = []
+        for name, milk in (('Блины', 500), ('Оладьи', 250)):
+            recipe = Recipe.objects.create(author=cls.user, name=name,
+                                           text='Описание', cooking_time=20)
+            NumberOfIngredients.objects.bulk_create([
+                NumberOfIngredients(recipe=recipe, ingredient=cls.flour,
+                                    amount=200),
+                NumberOfIngredients(recipe=recipe, ingredient=cls.milk,
+                                    amount=milk),
+            ])
+            cls.recipes.append(recipe)
+
+    def test_cart_changes_are_aggregated_per_ingredient(self):
+        for recipe in self.recipes:
+            ShoppingCart.objects.create(user=self.user, recipe=recipe)
+        self.assertEqual(get_shopping_list(self.user), [
+            {'name': 'Молоко', 'measurement_unit': 'мл', 'amount': 750},
+            {'name': 'Мука', 'measurement_unit': 'г', 'amount': 400},
+        ])
+        ShoppingCart.objects.filter(recipe=self.recipes[0]).delete()
+        self.assertEqual(get_shopping_list(self.user), [
+            {'name': 'Молоко', 'measurement_unit': 'мл', 'amount': 250},
+            {'name': 'Мука', 'measurement_unit': 'г', 'amount': 200},
+        ])
+
+    def test_recipe_edit_applies_ingredient_delta(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipes[0])
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.patch(
+            f'{RECIPES_URL}{self.recipes[0].id}/',
+            {
+                'name': 'Блины',
+                'text': 'Описание',
+                'cooking_time': 20,
+                'tags': [self.tag.id],
+                'ingredients': [{'id': self.flour.id, 'amount': 300}],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK,
+                         response.data)
+        self.assertEqual(get_shopping_list(self.user), [
+            {'name': 'Мука', 'measurement_unit': 'г', 'amount': 300},
+        ])
@@ -0,0 +1,57 @@
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+
+
+def _prepare(model, values):
+    connection_alias = router.db_for_write(model)
+    connection = connections[connection_alias]
+    fields = [model._meta.get_field(name) for name in values]
+    params = [
+        field.get_db_prep_save(field.to_python(value), connection)
+        for field, value in zip(fields, values.values())
+    ]
+    columns = [connection.ops.quote_name(field.column) for field in fields]
+    return connection_alias, connection, columns, params
+
+
+@transaction.atomic
+def insert_ignore(model, **values):
+    using, connection, columns, params = _prepare(model, values)
+    opts = model._meta
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(opts.db_table)} '
+            f'({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON CONFLICT DO NOTHING '
+            f'RETURNING {connection.ops.quote_name(opts.pk.column)}',
+            params
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None, False
+    instance = model(pk=row[0], **values)
+    instance._state.adding = False
+    instance._state.db = using
+    post_save.send(sender=model, instance=instance, created=True,
+                   update_fields=None, raw=False, using=using)
+    return instance, True
+
+
+@transaction.atomic
+def delete_returning(model, **values):
+    using, connection, columns, params = _prepare(model, values)
+    opts = model._meta
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(opts.db_table)} '
+            f'WHERE {" AND ".join(f"{column} = %s" for column in columns)} '
+            f'RETURNING {connection.ops.quote_name(opts.pk.column)}',
+            params
+        )
+        rows = cursor.fetchall()
+    for (pk, ) in rows:
+        instance = model(pk=pk, **values)
+        instance._state.db = using
+        post_delete.send(sender=model, instance=instance, using=using)
+    return len(rows)
@@ -1,151 +1,291 @@
-import io
+from functools import partial
+from urllib.parse import quote
 
-from django.db.models import Sum, Exists, OuterRef
-from django.http import FileResponse, Http404
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from users.models import User
+from users.models import Follow
 from recipes.models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.timeline import timeline_page
+
+from .bulk import add_recipes, clear_shopping_cart, remove_recipes
+from .caching import ReferenceCacheMixin
+from .db_routing import read_from_primary
+from .cooking_index import cooking_index
 from .filters import RecipeFilter
+from .metrics import SerializerTimingMixin, time_serializer
+from .ingredient_index import ingredient_index
 from .permissions import IsAuthorOrReadOnly
-from .paginations import CustomPageNumberPaginator
-from .serializers import (CreateRecipeSerializer, FavoritesSerializer,
-                          GetRecipeSerializer, IngredientSerializer,
-                          NumberOfIngredients, ShoppingCartSerializer,
-                          TagSerializer)
+from .parsers import MultiPartJSONParser
+from .paginations import (CursorPaginationMixin, CustomPageNumberPaginator,
+                          TimelineCursorPaginator)
+from .recipe_cache import get_recipe_detail, set_recipe_detail
+from .recipe_state import RecipeState
+from .renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from .serializers import (CreateRecipeSerializer, GetRecipeSerializer,
+                          IngredientSerializer, NumberOfIngredients,
+                          RecipeIdsSerializer, RecipeMatchSerializer,
+                          RecipeShoppingCartSerializer, TagSerializer)
+from .shopping_list import export_shopping_list, get_shopping_list
+from .uploads import LimitedTemporaryFileUploadHandler
+from .upserts import delete_returning, insert_ignore
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(SerializerTimingMixin, ReferenceCacheMixin,
+                 viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(SerializerTimingMixin, ReferenceCacheMixin,
+                        viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
     filter_backends = (filters.SearchFilter, )
     search_fields = ('^name', )
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get(api_settings.SEARCH_PARAM)
+        if not name:
+            return super().list(request, *args, **kwargs)
+        limit = settings.INGREDIENT_SEARCH_LIMIT
+        requested_limit = request.query_params.get('limit', '')
+        if requested_limit.isdigit():
+            limit = min(int(requested_limit), limit)
+        return Response(ingredient_index.search(name, limit))
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SerializerTimingMixin, CursorPaginationMixin,
+                    viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = [IsAuthorOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filter_class = RecipeFilter
     pagination_class = CustomPageNumberPaginator
+    parser_classes = [JSONParser, MultiPartJSONParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'timeline'):
             return GetRecipeSerializer
         return CreateRecipeSerializer
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Recipe.objects.select_related('author').prefetch_related(
+            'tags',
+            Prefetch('amount',
+                     queryset=NumberOfIngredients.objects.select_related(
+                         'ingredient'))
+        )
         if user.is_anonymous:
-            return Recipe.objects.all()
-        queryset = Recipe.objects.annotate(
-            is_favorited=Exists(Favorites.objects.filter(
-                user=user, recipe_id=OuterRef('pk'))),
-            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
-                user=user, recipe_id=OuterRef('pk'))))
+            return queryset
+        queryset = queryset.annotate(
+            is_subscribed=Exists(Follow.objects.filter(
+                user=user, author_id=OuterRef('author_id'))))
+        recipe_state = self.get_recipe_state()
         if self.request.GET.get('is_favorited'):
-            return queryset.filter(is_favorited=True)
+            return queryset.filter(
+                pk__in=list(recipe_state.recipe_ids('favorites')))
         elif self.request.GET.get('is_in_shopping_cart'):
-            return queryset.filter(is_in_shopping_cart=True)
+            return queryset.filter(
+                pk__in=list(recipe_state.recipe_ids('shopping_cart')))
         return queryset
 
-    @action(methods=['post', 'get'],
-            detail=True,
-            permission_classes=[IsAuthenticated])
-    def shopping_cart(self, request, pk=None):
-        user = get_object_or_404(User, pk=request.user.id)
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            recipe_id = int(self.kwargs[self.lookup_field])
+        except ValueError:
+            raise NotFound()
+        data = get_recipe_detail(recipe_id)
+        if data is None:
+            with read_from_primary():
+                response = super().retrieve(request, *args, **kwargs)
+            set_recipe_detail(recipe_id, response.data)
+            return response
+        user = request.user
+        if user.is_anonymous:
+            return Response(data)
+        recipe_state = self.get_recipe_state()
+        data = dict(
+            data,
+            is_favorited=recipe_state.is_favorited(data['id']),
+            is_in_shopping_cart=recipe_state.is_in_shopping_cart(data['id'])
+        )
+        data['author'] = dict(
+            data['author'],
+            is_subscribed=Follow.objects.filter(
+                user=user, author_id=data['author']['id']
+            ).exists()
+        )
+        return Response(data)
+
+    def get_recipe_state(self):
+        if not hasattr(self, '_recipe_state'):
+            self._recipe_state = RecipeState(self.request.user)
+        return self._recipe_state
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.user.is_authenticated:
+            context['recipe_state'] = self.get_recipe_state()
+        return context
+
+    def add_recipe(self, model, pk, errors):
         recipe = get_object_or_404(Recipe, pk=pk)
-        data = {'user': user.id, 'recipe': recipe.id}
-        serializer = ShoppingCartSerializer(
-            data=data, context={'request': request}
+        _, created = insert_ignore(model, user_id=self.request.user.id,
+                                   recipe_id=recipe.id)
+        if not created:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer = time_serializer(
+            self.request,
+            RecipeShoppingCartSerializer(
+                recipe, context=self.get_serializer_context()
+            )
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def remove_recipe(self, model, pk):
+        try:
+            return delete_returning(model, user_id=self.request.user.id,
+                                    recipe_id=pk)
+        except ValidationError:
+            return 0
+
+    def change_recipes(self, model, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if request.method == 'POST':
+            added = add_recipes(model, request.user.id, recipe_ids)
+            return Response({'added': added}, status=status.HTTP_201_CREATED)
+        removed = remove_recipes(model, request.user.id, recipe_ids)
+        return Response({'removed': removed})
+
+    @action(methods=['post', 'delete'],
+            detail=False,
+            url_path='shopping_cart',
+            permission_classes=[IsAuthenticated])
+    def bulk_shopping_cart(self, request):
+        return self.change_recipes(ShoppingCart, request)
+
+    @action(methods=['delete'],
+            detail=False,
+            url_path='shopping_cart/clear',
+            permission_classes=[IsAuthenticated])
+    def clear_cart(self, request):
+        clear_shopping_cart(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=['post', 'delete'],
+            detail=False,
+            url_path='favorite',
+            permission_classes=[IsAuthenticated])
+    def bulk_favorite(self, request):
+        return self.change_recipes(Favorites, request)
+
+    @action(methods=['post'],
+            detail=True,
+            permission_classes=[IsAuthenticated])
+    def shopping_cart(self, request, pk=None):
+        return self.add_recipe(ShoppingCart, pk,
+                               {'status': 'Рецепт уже добавлен!'})
+
     @shopping_cart.mapping.delete
     def delete_shoping_cart(self, request, pk):
-        user = request.user
-        try:
-            recipe = get_object_or_404(Recipe, id=pk)
-            shopping_cart = get_object_or_404(ShoppingCart,
-                                              user=user,
-                                              recipe=recipe)
-            shopping_cart.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Http404:
+        if not self.remove_recipe(ShoppingCart, pk):
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=['post'],
+            detail=False,
+            permission_classes=[AllowAny])
+    def what_to_cook(self, request):
+        serializer = RecipeMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        limit = min(serializer.validated_data.get('limit',
+                                                  settings.RECIPE_MATCH_LIMIT),
+                    settings.RECIPE_MATCH_LIMIT)
+        matches = cooking_index.match(
+            serializer.validated_data['ingredients'], limit
+        )
+        recipes = self.get_queryset().in_bulk(
+            [match['id'] for match in matches]
+        )
+        context = self.get_serializer_context()
+        data = []
+        for match in matches:
+            recipe = recipes.get(match['id'])
+            if recipe is None:
+                continue
+            item = time_serializer(
+                request, GetRecipeSerializer(recipe, context=context)
+            ).data
+            item['coverage'] = match['coverage']
+            item['missing'] = match['missing']
+            data.append(item)
+        return Response(data)
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def timeline(self, request):
+        paginator = TimelineCursorPaginator()
+        recipe_ids = paginator.paginate_entries(
+            request, partial(timeline_page, request.user.id)
+        )
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        page = [recipes[pk] for pk in recipe_ids if pk in recipes]
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, permission_classes=[IsAuthenticated])
+    def shopping_list(self, request):
+        return Response(get_shopping_list(request.user))
+
+    @action(detail=False,
+            permission_classes=[IsAuthenticated],
+            renderer_classes=[PDFRenderer, PlainTextRenderer, CSVRenderer])
     def download_shopping_cart(self, request):
-        ingredients = NumberOfIngredients.objects.filter(
-            recipe__shopping_cart__user=request.user
-        ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(Sum('amount'))
-        buf = io.BytesIO()
-        c = canvas.Canvas(buf, bottomup=0)
-        textob = c.beginText()
-        textob.setTextOrigin(inch, inch)
-        pdfmetrics.registerFont(TTFont('DejaVuSans',
-                                       'DejaVuSans.ttf',
-                                       'utf-8'))
-        textob.setFont("DejaVuSans", 14)
-        line_buf = ''
-        for line in ingredients:
-            line_buf = (line['ingredient__name'] +
-                        ', ' + line['ingredient__measurement_unit'] +
-                        ': ' + str(line['amount__sum']))
-            textob.textLine(line_buf)
-        c.drawText(textob)
-        c.showPage()
-        c.save()
-        buf.seek(0)
-        filename = f'shopping_cart {request.user}.pdf'
-        return FileResponse(buf, as_attachment=True, filename=filename)
-
-    @action(methods=['get', 'post'],
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            export_shopping_list(request.user, renderer.format),
+            content_type=renderer.content_type
+        )
+        filename = f'shopping_cart {request.user}.{renderer.format}'
+        try:
+            filename.encode('ascii')
+            file_expr = f'filename="{filename}"'
+        except UnicodeEncodeError:
+            file_expr = f"filename*=utf-8''{quote(filename)}"
+        response['Content-Disposition'] = f'attachment; {file_expr}'
+        return response
+
+    @action(methods=['post'],
             detail=True,
             permission_classes=[IsAuthenticated])
     def favorite(self, request, pk=None):
-        user = get_object_or_404(User, id=request.user.id)
-        recipe = get_object_or_404(Recipe, id=pk)
-        data = {'user': user.id,
-                'recipe': recipe.id}
-        serializer = FavoritesSerializer(
-            data=data, context={'request': request}
+        return self.add_recipe(
+            Favorites, pk, {'recipe': 'Рецепт уже был добавлен в избранное!'}
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk):
-        user = request.user
-        try:
-            recipe = get_object_or_404(Recipe, id=pk)
-            favorite = get_object_or_404(Favorites,
-                                         user=user,
-                                         recipe=recipe)
-            favorite.delete()
-        except Http404:
+        if not self.remove_recipe(Favorites, pk):
             data = {"errors": "BAD_REQUEST"}
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
         return Response(status=status.HTTP_204_NO_CONTENT)
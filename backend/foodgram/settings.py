@@ -22,17 +22,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
     'colorfield',
     'users',
-    'recipes',
-    'api',
+    'recipes.apps.RecipesConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.InstrumentationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,7 +68,7 @@ WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         ),
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
@@ -76,6 +79,69 @@ REST_FRAMEWORK = {
 
 AUTH_USER_MODEL = 'users.User'
 
+INGREDIENT_SEARCH_LIMIT = int(os.getenv('INGREDIENT_SEARCH_LIMIT', 50))
+
+RECIPE_MATCH_LIMIT = int(os.getenv('RECIPE_MATCH_LIMIT', 50))
+
+RECIPE_MATCH_INGREDIENTS_LIMIT = int(
+    os.getenv('RECIPE_MATCH_INGREDIENTS_LIMIT', 100)
+)
+
+COOKING_INDEX_SYNC_INTERVAL = float(
+    os.getenv('COOKING_INDEX_SYNC_INTERVAL', 1)
+)
+
+RECIPE_CHANGE_RETENTION = int(os.getenv('RECIPE_CHANGE_RETENTION', 3600))
+
+BULK_RECIPES_LIMIT = int(os.getenv('BULK_RECIPES_LIMIT', 100))
+
+TIMELINE_SIZE = int(os.getenv('TIMELINE_SIZE', 500))
+TIMELINE_FANOUT_LIMIT = int(os.getenv('TIMELINE_FANOUT_LIMIT', 10000))
+TIMELINE_BACKEND = os.getenv('TIMELINE_BACKEND', default='thread')
+TIMELINE_WORKERS = int(os.getenv('TIMELINE_WORKERS', 2))
+
+SLOW_REQUEST_QUERIES = int(os.getenv('SLOW_REQUEST_QUERIES', 20))
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', 1))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', 60 * 60))
+REFERENCE_VERSION_TIMEOUT = int(os.getenv('REFERENCE_VERSION_TIMEOUT', 5))
+
+RECIPE_STATE_CACHE_TIMEOUT = int(
+    os.getenv('RECIPE_STATE_CACHE_TIMEOUT', 60 * 5)
+)
+
+RECIPE_CACHE_TIMEOUT = int(os.getenv('RECIPE_CACHE_TIMEOUT', 60 * 15))
+
+TOKEN_CACHE_BACKEND = os.getenv('TOKEN_CACHE_BACKEND', 'local')
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+TOKEN_CACHE_TIMEOUT = int(os.getenv('TOKEN_CACHE_TIMEOUT', 60))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=4),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -91,10 +157,27 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host.strip(),
+                            TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_routing.ReplicaRouter']
+
+DATABASE_REPLICA_PIN_SECONDS = int(
+    os.getenv('DATABASE_REPLICA_PIN_SECONDS', 5)
+)
+
 """
 DATABASES = {
     'default': {
@@ -156,3 +239,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+RECIPE_IMAGE_MAX_SIZE = 12000000
+
+IMAGE_PROCESSING_BACKEND = os.getenv('IMAGE_PROCESSING_BACKEND',
+                                     default='thread')
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
@@ -2,8 +2,8 @@ from django.contrib import admin
 
 from .models import (Favorites,
                      Ingredient,
+                     NumberOfIngredients,
                      Recipe,
-                     IngredientRecipe,
                      ShoppingCart,
                      Tag)
 
@@ -22,8 +22,8 @@ class IngredientAdmin(admin.ModelAdmin):
     empty_value_display = '-empty-'
 
 
-class IngredientRecipeAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'recipe', 'ingredient')
+class NumberOfIngredientsAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipe', 'ingredient', 'amount')
 
 
 class RecipeAdmin(admin.ModelAdmin):
@@ -34,7 +34,7 @@ class RecipeAdmin(admin.ModelAdmin):
     readonly_fields = ['favorited_count']
 
     def favorited_count(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 class FavoritesAdmin(admin.ModelAdmin):
@@ -56,4 +56,4 @@ admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Favorites, FavoritesAdmin)
 admin.site.register(ShoppingCart, ShoppingCartAdmin)
-admin.site.register(IngredientRecipe, IngredientRecipeAdmin)
+admin.site.register(NumberOfIngredients, NumberOfIngredientsAdmin)
@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def table_name(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def get_executor(setting):
+    with _executors_lock:
+        if setting not in _executors:
+            _executors[setting] = ThreadPoolExecutor(
+                max_workers=getattr(settings, f'{setting}_WORKERS'),
+                thread_name_prefix=setting.lower().replace('_', '-')
+            )
+        return _executors[setting]
+
+
+def run_and_close(func, *args):
+    try:
+        func(*args)
+    finally:
+        connection.close()
+
+
+def run_on_commit(setting, func, *args):
+    if getattr(settings, f'{setting}_BACKEND') == 'sync':
+        transaction.on_commit(partial(func, *args))
+    else:
+        transaction.on_commit(partial(get_executor(setting).submit,
+                                      run_and_close, func, *args))
@@ -0,0 +1,68 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from api.recipe_cache import invalidate_recipe_detail
+
+from .db import run_on_commit
+from .models import Recipe
+
+VARIANTS = {
+    'thumbnail': (160, 160),
+    'card': (480, 360),
+    'detail': (1200, 900),
+}
+VARIANTS_PATH = 'recipes/variants/'
+WEBP_QUALITY = 80
+
+
+def needs_variants(recipe):
+    return (bool(recipe.image) and
+            recipe.image_variants.get('source') != recipe.image.name)
+
+
+def delete_variants(image_variants):
+    for name in VARIANTS:
+        path = image_variants.get(name)
+        if path:
+            default_storage.delete(path)
+
+
+def encode_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    buf = io.BytesIO()
+    variant.save(buf, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return ContentFile(buf.getvalue())
+
+
+def generate_variants(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or not needs_variants(recipe):
+        return
+    source = recipe.image.name
+    with default_storage.open(source) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    stem = os.path.splitext(os.path.basename(source))[0]
+    image_variants = {'source': source}
+    for name, size in VARIANTS.items():
+        image_variants[name] = default_storage.save(
+            f'{VARIANTS_PATH}{stem}_{name}.webp',
+            encode_variant(image, size)
+        )
+    updated = Recipe.objects.filter(pk=recipe_id, image=source).update(
+        image_variants=image_variants
+    )
+    if not updated:
+        delete_variants(image_variants)
+        return
+    invalidate_recipe_detail(recipe_id)
+    delete_variants(recipe.image_variants)
+
+
+def schedule_variants(recipe_id):
+    run_on_commit('IMAGE_PROCESSING', generate_variants, recipe_id)
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.caching import invalidate_reference
+from recipes.models import Ingredient
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield {'name': row[0], 'measurement_unit': row[1]}
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in iter(lambda: file.read(JSON_CHUNK_SIZE), ''):
+        buffer += chunk
+        if not started:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if buffer[0] != '[':
+                raise CommandError('Ожидается JSON-массив ингредиентов')
+            buffer = buffer[1:]
+            started = True
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if not buffer or buffer[0] == ']':
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError as exc:
+                if len(buffer) >= JSON_CHUNK_SIZE:
+                    raise CommandError(f'Некорректный JSON: {exc}')
+                break
+            if not isinstance(item, dict):
+                raise CommandError(
+                    'Элементы JSON-массива должны быть объектами'
+                )
+            yield item
+            buffer = buffer[end:]
+    if buffer.strip() not in ('', ']'):
+        raise CommandError('Некорректный JSON в конце файла')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=READERS.keys())
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Обновлять единицы измерения существующих ингредиентов'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = (options['format'] or
+                       os.path.splitext(path)[1].lstrip('.').lower())
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть больше нуля')
+        name_length = Ingredient._meta.get_field('name').max_length
+        unit_length = Ingredient._meta.get_field(
+            'measurement_unit').max_length
+        save_batch = (self.upsert_batch if options['update']
+                      else self.insert_batch)
+        processed = skipped = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8') as file:
+            rows = READERS[file_format](file)
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                batch = {}
+                for row in chunk:
+                    name = str(row.get('name') or '').strip()
+                    unit = str(row.get('measurement_unit') or '').strip()
+                    if (not name or not unit or len(name) > name_length or
+                            len(unit) > unit_length):
+                        skipped += 1
+                        continue
+                    batch[name] = unit
+                with transaction.atomic():
+                    save_batch(batch)
+                processed += len(batch)
+        invalidate_reference(Ingredient)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {processed} ингредиентов, пропущено {skipped} '
+            f'за {elapsed:.2f} с ({processed / max(elapsed, 1e-6):.0f} '
+            f'строк/с)'
+        ))
+
+    def insert_batch(self, batch):
+        Ingredient.objects.bulk_create(
+            (Ingredient(name=name, measurement_unit=unit)
+             for name, unit in batch.items()),
+            ignore_conflicts=True
+        )
+
+    def upsert_batch(self, batch):
+        existing = Ingredient.objects.filter(name__in=batch.keys())
+        changed = []
+        for ingredient in existing:
+            unit = batch.pop(ingredient.name)
+            if ingredient.measurement_unit != unit:
+                ingredient.measurement_unit = unit
+                changed.append(ingredient)
+        Ingredient.objects.bulk_update(changed, ['measurement_unit'])
+        self.insert_batch(batch)
@@ -0,0 +1,79 @@
+# Generated by Django 2.2.19 on 2026-10-18 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorites = apps.get_model('recipes', 'Favorites')
+    User = apps.get_model('users', 'User')
+    favorites = Favorites.objects.filter(
+        recipe=OuterRef('pk')
+    ).order_by().values('recipe').annotate(total=Count('pk')).values('total')
+    Recipe.objects.update(
+        favorites_count=Coalesce(Subquery(favorites), 0)
+    )
+    recipes = Recipe.objects.filter(
+        author=OuterRef('pk')
+    ).order_by().values('author').annotate(total=Count('pk')).values('total')
+    User.objects.update(
+        recipes_count=Coalesce(Subquery(recipes), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_recipes_count'),
+        ('recipes', '0010_auto_20220208_1324'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recipe',
+            options={'ordering': ['-pub_date', '-id'],
+                     'verbose_name': 'Рецепт',
+                     'verbose_name_plural': 'Рецепты'},
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='pub_date',
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name='В избранном'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date', '-id'],
+                               name='recipe_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'],
+                               name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tagrecipe',
+            index=models.Index(fields=['tag', 'recipe'],
+                               name='tagrecipe_tag_recipe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='numberofingredients',
+            index=models.Index(fields=['recipe', 'ingredient'],
+                               name='amount_recipe_ingredient_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
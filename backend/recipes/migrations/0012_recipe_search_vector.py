@@ -0,0 +1,42 @@
+# Generated by Django 2.2.19 on 2026-10-18 13:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+FILL_SEARCH_VECTOR = '''
+UPDATE recipes_recipe AS r SET search_vector =
+    setweight(to_tsvector('russian', coalesce(r.name, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce((
+        SELECT string_agg(i.name, ' ')
+        FROM recipes_numberofingredients AS n
+        JOIN recipes_ingredient AS i ON i.id = n.ingredient_id
+        WHERE n.recipe_id = r.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('russian', coalesce(r.text, '')), 'C');
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_indexes_and_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                null=True,
+                verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx'),
+        ),
+        migrations.RunSQL(FILL_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
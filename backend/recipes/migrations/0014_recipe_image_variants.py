@@ -0,0 +1,22 @@
+# Generated by Django 2.2.19 on 2026-10-18 15:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants',
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                default=dict,
+                editable=False,
+                verbose_name='Варианты изображения'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.19 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    NumberOfIngredients = apps.get_model('recipes', 'NumberOfIngredients')
+    duplicates = NumberOfIngredients.objects.values(
+        'recipe', 'ingredient'
+    ).annotate(
+        rows=Count('pk'), total=Sum('amount'), first=Min('pk')
+    ).filter(rows__gt=1).order_by()
+    for row in list(duplicates):
+        NumberOfIngredients.objects.filter(pk=row['first']).update(
+            amount=row['total']
+        )
+        NumberOfIngredients.objects.filter(
+            recipe=row['recipe'], ingredient=row['ingredient']
+        ).exclude(pk=row['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='recipe',
+                    name='ingredients',
+                    field=models.ManyToManyField(
+                        related_name='recipes',
+                        through='recipes.NumberOfIngredients',
+                        to='recipes.Ingredient',
+                        verbose_name='Ингредиенты'),
+                ),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='IngredientRecipe',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.19 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_consolidate_recipe_ingredients'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='numberofingredients',
+            name='amount_recipe_ingredient_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='numberofingredients',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'ingredient'),
+                name='unique_recipe_ingredient'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_timelines(apps, schema_editor):
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Follow = apps.get_model('users', 'Follow')
+    quote_name = schema_editor.connection.ops.quote_name
+    schema_editor.execute(
+        f'INSERT INTO {quote_name(TimelineEntry._meta.db_table)} '
+        f'(user_id, recipe_id, pub_date) '
+        f'SELECT user_id, recipe_id, pub_date FROM ('
+        f'SELECT follow.user_id, recipe.id AS recipe_id, recipe.pub_date, '
+        f'row_number() OVER (PARTITION BY follow.user_id '
+        f'ORDER BY recipe.pub_date DESC, recipe.id DESC) AS position '
+        f'FROM {quote_name(Follow._meta.db_table)} AS follow '
+        f'JOIN {quote_name(Recipe._meta.db_table)} AS recipe '
+        f'ON recipe.author_id = follow.author_id '
+        f'WHERE follow.user_id IS NOT NULL) AS ranked '
+        f'WHERE position <= %s ON CONFLICT DO NOTHING',
+        [settings.TIMELINE_SIZE]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0006_user_followers_count'),
+        ('recipes', '0016_numberofingredients_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True,
+                                        primary_key=True,
+                                        serialize=False,
+                                        verbose_name='ID')),
+                ('pub_date', models.DateTimeField(
+                    verbose_name='Дата публикации')),
+                ('recipe', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='timeline_entries',
+                    to='recipes.Recipe',
+                    verbose_name='Рецепт')),
+                ('user', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='timeline',
+                    to=settings.AUTH_USER_MODEL,
+                    verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Лента подписок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_timeline_entry'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-recipe'],
+                               name='timeline_user_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
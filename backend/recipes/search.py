@@ -0,0 +1,37 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+from django.db.models import TextField, Value
+
+from .models import Ingredient, Recipe
+
+SEARCH_CONFIG = 'russian'
+UPDATE_ALL_SQL = '''
+UPDATE recipes_recipe AS r SET search_vector =
+    setweight(to_tsvector(%(config)s, coalesce(r.name, '')), 'A') ||
+    setweight(to_tsvector(%(config)s, coalesce((
+        SELECT string_agg(i.name, ' ')
+        FROM recipes_numberofingredients AS n
+        JOIN recipes_ingredient AS i ON i.id = n.ingredient_id
+        WHERE n.recipe_id = r.id
+    ), '')), 'B') ||
+    setweight(to_tsvector(%(config)s, coalesce(r.text, '')), 'C')
+WHERE r.id >= %(first_id)s
+'''
+
+
+def update_search_vector(recipe_id):
+    ingredients = ' '.join(Ingredient.objects.filter(
+        amount__recipe_id=recipe_id
+    ).values_list('name', flat=True))
+    Recipe.objects.filter(pk=recipe_id).update(search_vector=(
+        SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector(Value(ingredients, output_field=TextField()),
+                     weight='B', config=SEARCH_CONFIG) +
+        SearchVector('text', weight='C', config=SEARCH_CONFIG)
+    ))
+
+
+def update_all_search_vectors(first_id=0):
+    with connection.cursor() as cursor:
+        cursor.execute(UPDATE_ALL_SQL, {'config': SEARCH_CONFIG,
+                                        'first_id': first_id})
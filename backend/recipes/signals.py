@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Follow
+
+from .images import needs_variants, schedule_variants
+from .models import Favorites, Recipe
+from .search import update_search_vector
+from .timeline import (backfill, fans_out, remove_author,
+                       schedule_fan_out)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Favorites)
+def favorite_created(sender, instance, created, **kwargs):
+    if created:
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Favorites)
+def favorite_deleted(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id,
+                          favorites_count__gt=0).update(
+        favorites_count=F('favorites_count') - 1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+        if fans_out(instance.author_id):
+            schedule_fan_out(instance.id)
+    update_search_vector(instance.id)
+    if needs_variants(instance):
+        schedule_variants(instance.id)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    User.objects.filter(pk=instance.author_id,
+                        recipes_count__gt=0).update(
+        recipes_count=F('recipes_count') - 1
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if not created or None in (instance.user_id, instance.author_id):
+        return
+    User.objects.filter(pk=instance.author_id).update(
+        followers_count=F('followers_count') + 1
+    )
+    if fans_out(instance.author_id):
+        backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if None in (instance.user_id, instance.author_id):
+        return
+    User.objects.filter(pk=instance.author_id,
+                        followers_count__gt=0).update(
+        followers_count=F('followers_count') - 1
+    )
+    remove_author(instance.user_id, instance.author_id)
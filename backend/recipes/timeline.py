@@ -0,0 +1,150 @@
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, router
+
+from users.models import Follow
+
+from .db import run_on_commit, table_name
+from .models import Recipe, TimelineEntry
+
+User = get_user_model()
+
+
+def fans_out(author_id):
+    return User.objects.filter(
+        pk=author_id,
+        followers_count__lte=settings.TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def trim_timelines(user_ids):
+    if not user_ids:
+        return
+    entries = table_name(TimelineEntry)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {entries} USING ('
+            f'SELECT follower.user_id, cutoff.pub_date, cutoff.recipe_id '
+            f'FROM unnest(%s::integer[]) AS follower(user_id) '
+            f'CROSS JOIN LATERAL (SELECT pub_date, recipe_id '
+            f'FROM {entries} WHERE user_id = follower.user_id '
+            f'ORDER BY pub_date DESC, recipe_id DESC OFFSET %s LIMIT 1'
+            f') AS cutoff) AS bound '
+            f'WHERE {entries}.user_id = bound.user_id '
+            f'AND ({entries}.pub_date, {entries}.recipe_id) '
+            f'<= (bound.pub_date, bound.recipe_id)',
+            [list(user_ids), settings.TIMELINE_SIZE]
+        )
+
+
+def fan_out(recipe_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table_name(TimelineEntry)} '
+            f'(user_id, recipe_id, pub_date) '
+            f'SELECT follow.user_id, recipe.id, recipe.pub_date '
+            f'FROM {table_name(Recipe)} AS recipe '
+            f'JOIN {table_name(Follow)} AS follow '
+            f'ON follow.author_id = recipe.author_id '
+            f'WHERE recipe.id = %s AND follow.user_id IS NOT NULL '
+            f'ON CONFLICT DO NOTHING RETURNING user_id',
+            [recipe_id]
+        )
+        user_ids = [user_id for user_id, in cursor.fetchall()]
+    trim_timelines(user_ids)
+
+
+def schedule_fan_out(recipe_id):
+    run_on_commit('TIMELINE', fan_out, recipe_id)
+
+
+def backfill(user_id, author_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table_name(TimelineEntry)} '
+            f'(user_id, recipe_id, pub_date) '
+            f'SELECT %s, id, pub_date FROM {table_name(Recipe)} '
+            f'WHERE author_id = %s ORDER BY pub_date DESC, id DESC '
+            f'LIMIT %s ON CONFLICT DO NOTHING',
+            [user_id, author_id, settings.TIMELINE_SIZE]
+        )
+    trim_timelines([user_id])
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id,
+                                 recipe__author_id=author_id).delete()
+
+
+def rebuild_timelines(user_ids=None):
+    scope, params = '', []
+    if user_ids is not None:
+        scope, params = 'AND follow.user_id = ANY(%s) ', [list(user_ids)]
+    with connection.cursor() as cursor:
+        if user_ids is None:
+            cursor.execute(f'DELETE FROM {table_name(TimelineEntry)}')
+        else:
+            cursor.execute(
+                f'DELETE FROM {table_name(TimelineEntry)} '
+                f'WHERE user_id = ANY(%s)',
+                params
+            )
+        cursor.execute(
+            f'INSERT INTO {table_name(TimelineEntry)} '
+            f'(user_id, recipe_id, pub_date) '
+            f'SELECT user_id, recipe_id, pub_date FROM ('
+            f'SELECT follow.user_id, recipe.id AS recipe_id, '
+            f'recipe.pub_date, row_number() OVER ('
+            f'PARTITION BY follow.user_id '
+            f'ORDER BY recipe.pub_date DESC, recipe.id DESC) AS position '
+            f'FROM {table_name(Follow)} AS follow '
+            f'JOIN {table_name(Recipe)} AS recipe '
+            f'ON recipe.author_id = follow.author_id '
+            f'JOIN {table_name(User)} AS author '
+            f'ON author.id = follow.author_id '
+            f'WHERE follow.user_id IS NOT NULL {scope}'
+            f'AND author.followers_count <= %s) AS ranked '
+            f'WHERE position <= %s',
+            params + [settings.TIMELINE_FANOUT_LIMIT, settings.TIMELINE_SIZE]
+        )
+
+
+def _newest(cursor, sql, params, position, limit, id_column):
+    if position is not None:
+        sql += f' AND (pub_date, {id_column}) < (%s, %s)'
+        params = params + list(position)
+    cursor.execute(
+        f'{sql} ORDER BY pub_date DESC, {id_column} DESC LIMIT %s',
+        params + [limit]
+    )
+    return cursor.fetchall()
+
+
+def timeline_page(user_id, position, limit):
+    authors = list(Follow.objects.filter(
+        user_id=user_id,
+        author__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).values_list('author_id', flat=True))
+    with connections[router.db_for_read(TimelineEntry)].cursor() as cursor:
+        fanned_out = _newest(
+            cursor,
+            f'SELECT pub_date, recipe_id FROM {table_name(TimelineEntry)} '
+            f'WHERE user_id = %s',
+            [user_id], position, limit, 'recipe_id'
+        )
+        fanned_in = authors and _newest(
+            cursor,
+            f'SELECT pub_date, id FROM {table_name(Recipe)} '
+            f'WHERE author_id = ANY(%s)',
+            [authors], position, limit, 'id'
+        )
+    entries = []
+    seen = set()
+    for pub_date, recipe_id in heapq.merge(fanned_out, fanned_in,
+                                           reverse=True):
+        if recipe_id not in seen:
+            seen.add(recipe_id)
+            entries.append((pub_date, recipe_id))
+    return entries[:limit]
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_followers_count(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Follow = apps.get_model('users', 'Follow')
+    followers = Follow.objects.filter(
+        author=OuterRef('pk'), user__isnull=False
+    ).order_by().values('author').annotate(total=Count('pk')).values('total')
+    User.objects.update(
+        followers_count=Coalesce(Subquery(followers), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name='Количество подписчиков'),
+        ),
+        migrations.RunPython(fill_followers_count,
+                             migrations.RunPython.noop),
+    ]
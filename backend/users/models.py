@@ -24,6 +24,16 @@ class User(AbstractUser):
         verbose_name='Фамилия'
     )
     is_staff = models.BooleanField(default=False)
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
 
     USERNAME_FIELD = 'email'
 
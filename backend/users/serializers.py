@@ -1,19 +1,20 @@
-from django.shortcuts import get_object_or_404
 from djoser.serializers import (UserCreateSerializer as
                                 DjoserUserCreateSerializer)
 from djoser.serializers import (UserSerializer as
                                 DjoserUserSerializer)
 from rest_framework import serializers
 
+from api.fields import ImageVariantsField
 from recipes.models import Recipe
 from .models import Follow, User
 
 
 class RecipeShoppingCartSerializer(serializers.ModelSerializer):
+    images = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'images', 'cooking_time')
 
 
 class UserSerializer(DjoserUserSerializer):
@@ -35,6 +36,8 @@ class UserSerializer(DjoserUserSerializer):
         user = self.context['request'].user
         if user.is_anonymous:
             return False
+        if hasattr(author, 'is_subscribed'):
+            return author.is_subscribed
         return Follow.objects.filter(user__id=user.id,
                                      author__id=author.id).exists()
 
@@ -63,10 +66,13 @@ class SubscriptionsSerializer(UserSerializer):
 
     def get_recipes(self, following):
         request = self.context['request']
-        limit = request.query_params.get('recipes_limit')
-        qs = (following.recipes.all()[:int(limit)]
-              if limit is not None
-              else following.recipes.all())
+        if hasattr(following, 'recipes_preview'):
+            qs = following.recipes_preview
+        else:
+            limit = request.query_params.get('recipes_limit')
+            qs = (following.recipes.all()[:int(limit)]
+                  if limit is not None
+                  else following.recipes.all())
         context = {'request': request}
         return RecipeShoppingCartSerializer(qs,
                                             many=True,
@@ -76,43 +82,12 @@ class SubscriptionsSerializer(UserSerializer):
         user = self.context['request'].user
         if user.is_anonymous:
             return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         return Follow.objects.filter(user=user, author=obj.id).exists()
 
     def get_recipes_count(self, obj):
-        counter = Recipe.objects.filter(author__username=obj).count()
-        return counter
-
-
-class CreateFollowSerializer(serializers.ModelSerializer):
-    queryset = User.objects.all()
-    user = serializers.PrimaryKeyRelatedField(queryset=queryset)
-    author = serializers.PrimaryKeyRelatedField(queryset=queryset)
-
-    class Meta:
-        model = Follow
-        fields = ('user', 'author')
-
-    def validate(self, data):
-        user = data['user'].id
-        following = data['author'].id
-        if user == following:
-            raise serializers.ValidationError({
-                    'user': 'На самого себя нельзя подписываться!'
-            })
-        if Follow.objects.filter(
-                author__id=following,
-                user__id=user).exists():
-            raise serializers.ValidationError({
-                    'user': 'Вы уже подписаны на этого автора!'
-            })
-        return data
-
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        instance_user = get_object_or_404(User,
-                                          username=instance)
-        return ShowFollowSerializer(instance_user,
-                                    context={'request': request}).data
+        return obj.recipes_count
 
 
 class ShowFollowSerializer(serializers.ModelSerializer):
@@ -129,8 +104,7 @@ class ShowFollowSerializer(serializers.ModelSerializer):
         return RecipeShoppingCartSerializer(recipes, many=True).data
 
     def get_recipe_count(self, obj):
-        queryset = Recipe.objects.filter(author=obj)
-        return queryset.count()
+        return obj.recipes_count
 
     def get_is_subscribed(self, obj):
         user = self.context['request'].user
@@ -1,3 +1,5 @@
+from django.db.models import (BooleanField, OuterRef, Prefetch, Subquery,
+                              Value)
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status
@@ -5,16 +7,22 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.paginations import CustomPageNumberPaginator
+from api.metrics import SerializerTimingMixin, time_serializer
+from api.paginations import (CursorPaginationMixin, CustomPageNumberPaginator,
+                             SubscriptionsCursorPaginator)
+from api.upserts import delete_returning, insert_ignore
+from recipes.models import Recipe
 from .models import Follow, User
-from .serializers import (CreateFollowSerializer, SubscriptionsSerializer,
+from .serializers import (ShowFollowSerializer, SubscriptionsSerializer,
                           UserSerializer)
 
 
-class UserViewSet(DjoserUserViewSet):
+class UserViewSet(SerializerTimingMixin, CursorPaginationMixin,
+                  DjoserUserViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = CustomPageNumberPaginator
+    cursor_pagination_class = SubscriptionsCursorPaginator
 
     def get_queryset(self):
         if self.action == 'following_list':
@@ -24,32 +32,48 @@ class UserViewSet(DjoserUserViewSet):
     @action(detail=True,
             permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
-        follower = Follow.objects.values_list(
-            'author__username').filter(user=request.user)
-        queryset = User.objects.filter(username__in=follower)
+        recipes = Recipe.objects.all()
+        limit = request.query_params.get('recipes_limit')
+        if limit is not None and limit.isdigit():
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author_id=OuterRef('author_id')
+                ).values('pk')[:int(limit)]
+            ))
+        queryset = User.objects.filter(
+            following__user=request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='recipes_preview')
+        )
         pages = self.paginate_queryset(queryset)
         context = {'request': request}
-        serializer = SubscriptionsSerializer(pages,
-                                             many=True,
-                                             context=context)
+        serializer = time_serializer(request, SubscriptionsSerializer(
+            pages, many=True, context=context
+        ))
         return self.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['post', 'delete'],
             permission_classes=[IsAuthenticated])
     def subscribe(self, request, pk=None):
         following = get_object_or_404(User, pk=pk)
-        follower = request.user
-        data = {'user': follower.id,
-                'author': following.id}
-        context = {'request': request}
-        serializer = CreateFollowSerializer(data=data,
-                                            context=context)
         if request.method == 'POST':
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
+            if following.id == request.user.id:
+                errors = {'user': 'На самого себя нельзя подписываться!'}
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            _, created = insert_ignore(Follow, user_id=request.user.id,
+                                       author_id=following.id)
+            if not created:
+                errors = {'user': 'Вы уже подписаны на этого автора!'}
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer = time_serializer(request, ShowFollowSerializer(
+                following, context={'request': request}
+            ))
             return Response(serializer.data,
                             status=status.HTTP_201_CREATED)
-        get_object_or_404(Follow,
-                          user=request.user,
-                          author=following).delete()
+        if not delete_returning(Follow, user_id=request.user.id,
+                                author_id=following.id):
+            errors = {'user': 'Вы не подписаны на этого автора!'}
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
         return Response(status=status.HTTP_204_NO_CONTENT)